@@ -0,0 +1,34 @@
+import argparse
+import logging
+from src.database import Database
+from src.exporter import SnapshotExporter
+
+# 日志配置
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+def main():
+    parser = argparse.ArgumentParser(description="导出 items 表的 Arrow 快照 (按月份/类型分区)")
+    parser.add_argument('--db', default="data/papers.db", help="SQLite 数据库路径")
+    parser.add_argument('--out', default="data/snapshots", help="快照输出目录")
+    parser.add_argument('--batch-size', type=int, default=1000, help="每批从 SQLite 读取的行数")
+    parser.add_argument('--full', action='store_true', help="忽略上次导出记录，重写所有分区")
+    args = parser.parse_args()
+
+    db = Database(args.db)
+    exporter = SnapshotExporter(db, out_dir=args.out, batch_size=args.batch_size)
+
+    logger.info(f"📦 开始导出快照到 {args.out} ...")
+    written, removed = exporter.export(full=args.full)
+    for key in written:
+        logger.info(f"   写入分区 {key}")
+    for key in removed:
+        logger.info(f"   删除分区 {key}")
+    if not written and not removed:
+        logger.info("没有分区发生变化，无需导出。")
+
+    db.close()
+    logger.info("🎉 导出完成！")
+
+if __name__ == "__main__":
+    main()
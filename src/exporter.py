@@ -0,0 +1,258 @@
+import hashlib
+import json
+import os
+import shutil
+from datetime import datetime
+
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.fs as pafs
+
+# 快照中每个 Arrow 文件的列 (month/type 作为 hive 分区目录，不重复写入文件)
+SNAPSHOT_SCHEMA = pa.schema([
+    ("id", pa.string()),
+    ("source", pa.string()),
+    ("title", pa.string()),
+    ("author", pa.string()),
+    ("abstract", pa.string()),
+    ("url", pa.string()),
+    ("date", pa.string()),
+    ("tags", pa.list_(pa.string())),
+    ("ai_score", pa.float64()),
+    ("ai_comment", pa.string()),
+    ("media_url", pa.string()),
+    ("is_read", pa.int64()),
+    ("is_star", pa.int64()),
+    ("user_notes", pa.string()),
+    ("fetched_at", pa.string()),
+])
+
+MANIFEST_NAME = "_manifest.json"
+PART_FILE_NAME = "part-0.arrow"
+UNKNOWN_PARTITION = "unknown"
+
+# 分区键直接在 SQLite 里算，避免把整表拉回 Python 再分组
+# (部分抓取结果的 date 被存成了字符串 'None'，一并归到 unknown)
+_MONTH_EXPR = (f"CASE WHEN date IS NULL OR date IN ('', 'None') THEN '{UNKNOWN_PARTITION}' "
+               f"ELSE substr(date, 1, 7) END")
+_TYPE_EXPR = f"COALESCE(NULLIF(type, ''), '{UNKNOWN_PARTITION}')"
+
+
+class SnapshotExporter:
+    """把 items 表导出为按 月份/类型 分区的 Arrow IPC 快照，并支持增量导出"""
+
+    def __init__(self, db, out_dir="data/snapshots", batch_size=1000):
+        self.conn = db.conn
+        self.out_dir = out_dir
+        self.batch_size = batch_size
+
+    def _partition_fingerprints(self):
+        """每个分区的指纹：行数 + 分区内所有行内容的哈希
+
+        任何一行的任何导出字段变化都会改变指纹 (包括用户笔记、已读/星标)，
+        quote() 保证字段拼接无歧义。按 分区、id 排序后分批读取、逐行更新哈希，
+        不会把整个分区的内容拼成一个大字符串。
+        """
+        row_expr = " || ',' || ".join(f"quote({name})" for name in SNAPSHOT_SCHEMA.names)
+        cursor = self.conn.cursor()
+        cursor.row_factory = None
+        cursor.execute(f'''
+            SELECT {_MONTH_EXPR} AS month, {_TYPE_EXPR} AS type, {row_expr}
+            FROM items
+            ORDER BY month, type, id
+        ''')
+        fingerprints = {}
+        key, count, digest = None, 0, None
+        while True:
+            rows = cursor.fetchmany(self.batch_size)
+            if not rows:
+                break
+            for month, item_type, row_text in rows:
+                row_key = f"{month}/{item_type}"
+                if row_key != key:
+                    if key is not None:
+                        fingerprints[key] = [count, digest.hexdigest()]
+                    key, count, digest = row_key, 0, hashlib.sha1()
+                count += 1
+                digest.update(row_text.encode('utf-8'))
+                digest.update(b"\n")
+        if key is not None:
+            fingerprints[key] = [count, digest.hexdigest()]
+        return fingerprints
+
+    def _load_manifest(self):
+        path = os.path.join(self.out_dir, MANIFEST_NAME)
+        if not os.path.exists(path):
+            return {}
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f).get('partitions', {})
+
+    def _save_manifest(self, partitions):
+        path = os.path.join(self.out_dir, MANIFEST_NAME)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'exported_at': datetime.now().isoformat(),
+                'partitions': partitions,
+            }, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
+
+    def _partition_dir(self, month, item_type):
+        return os.path.join(self.out_dir, f"month={month}", f"type={item_type}")
+
+    def _partition_path(self, month, item_type):
+        return os.path.join(self._partition_dir(month, item_type), PART_FILE_NAME)
+
+    def _partition_tmp_path(self, month, item_type):
+        # 临时文件以 "_" 开头，pyarrow 发现数据集时默认会跳过，不会读到半成品
+        return os.path.join(self._partition_dir(month, item_type), f"_{PART_FILE_NAME}.tmp")
+
+    def _partitions_on_disk(self):
+        """扫描 out_dir 下实际存在的 month=*/type=* 分区目录"""
+        keys = set()
+        for month_name in os.listdir(self.out_dir):
+            month_dir = os.path.join(self.out_dir, month_name)
+            if not month_name.startswith("month=") or not os.path.isdir(month_dir):
+                continue
+            for type_name in os.listdir(month_dir):
+                if type_name.startswith("type=") and os.path.isdir(os.path.join(month_dir, type_name)):
+                    keys.add(f"{month_name[len('month='):]}/{type_name[len('type='):]}")
+        return keys
+
+    def _remove_partition(self, month, item_type):
+        shutil.rmtree(self._partition_dir(month, item_type), ignore_errors=True)
+        month_dir = os.path.join(self.out_dir, f"month={month}")
+        if os.path.isdir(month_dir) and not os.listdir(month_dir):
+            os.rmdir(month_dir)
+
+    def _iter_batches(self, keys=None):
+        """一次查询流式读取需要导出的分区，产出 (分区, RecordBatch)
+
+        结果按 month/type 排序，同一分区的行是连续的；每批在分区边界处切开，
+        这样整张表只扫描一次。keys 为 None 时导出全部分区。
+        """
+        columns = ", ".join(SNAPSHOT_SCHEMA.names)
+        where, params = "", []
+        if keys is not None:
+            where = f"WHERE ({_MONTH_EXPR}, {_TYPE_EXPR}) IN (VALUES {', '.join(['(?, ?)'] * len(keys))})"
+            for key in keys:
+                params.extend(key.split("/", 1))
+        cursor = self.conn.cursor()
+        cursor.row_factory = None
+        cursor.execute(f'''
+            SELECT {_MONTH_EXPR} AS month, {_TYPE_EXPR} AS type, {columns}
+            FROM items
+            {where}
+            ORDER BY month, type, date DESC, ai_score DESC
+        ''', params)
+        while True:
+            rows = cursor.fetchmany(self.batch_size)
+            if not rows:
+                break
+            start = 0
+            for i in range(1, len(rows) + 1):
+                if i == len(rows) or rows[i][:2] != rows[start][:2]:
+                    yield f"{rows[start][0]}/{rows[start][1]}", self._to_batch(rows[start:i])
+                    start = i
+
+    @staticmethod
+    def _decode_tags(item_id, raw):
+        """tags 必须是 JSON 列表；字符串会被 pyarrow 拆成单个字符，所以直接报错"""
+        tags = json.loads(raw) if raw else []
+        if not isinstance(tags, list) or not all(isinstance(t, str) for t in tags):
+            raise ValueError(f"items.tags 不是字符串列表 (id={item_id}): {raw!r}")
+        return tags
+
+    def _to_batch(self, rows):
+        arrays = [list(col) for col in zip(*(row[2:] for row in rows))]
+        id_idx = SNAPSHOT_SCHEMA.get_field_index("id")
+        tags_idx = SNAPSHOT_SCHEMA.get_field_index("tags")
+        arrays[tags_idx] = [self._decode_tags(item_id, raw)
+                            for item_id, raw in zip(arrays[id_idx], arrays[tags_idx])]
+        return pa.RecordBatch.from_arrays(
+            [pa.array(col, type=field.type) for col, field in zip(arrays, SNAPSHOT_SCHEMA)],
+            schema=SNAPSHOT_SCHEMA,
+        )
+
+    def _write_partitions(self, keys=None):
+        """按分区切换 IPC writer，把 _iter_batches 的结果写成各分区的文件"""
+        current_key, sink, writer = None, None, None
+
+        def finish():
+            writer.close()
+            sink.close()
+            month, item_type = current_key.split("/", 1)
+            # 先写临时文件再替换，读取方不会看到写了一半的分区
+            os.replace(self._partition_tmp_path(month, item_type), self._partition_path(month, item_type))
+
+        try:
+            for key, batch in self._iter_batches(keys):
+                if key != current_key:
+                    if writer is not None:
+                        finish()
+                    month, item_type = key.split("/", 1)
+                    os.makedirs(self._partition_dir(month, item_type), exist_ok=True)
+                    # 不压缩：压缩过的缓冲区读取时必须解压到新内存，就做不到零拷贝了
+                    sink = pa.OSFile(self._partition_tmp_path(month, item_type), 'wb')
+                    writer = pa.ipc.new_file(sink, SNAPSHOT_SCHEMA)
+                    current_key = key
+                writer.write_batch(batch)
+            if writer is not None:
+                finish()
+        finally:
+            # 出错时只关闭文件，不替换；残留的临时文件不会被读取
+            if sink is not None and not sink.closed:
+                sink.close()
+
+    def export(self, full=False):
+        """导出有变化的分区，返回 (写入的分区, 删除的分区)"""
+        os.makedirs(self.out_dir, exist_ok=True)
+        previous = self._load_manifest()
+        current = self._partition_fingerprints()
+
+        written = []
+        for key, fingerprint in sorted(current.items()):
+            month, item_type = key.split("/", 1)
+            # 指纹没变且文件还在才跳过，文件丢了要补写
+            if (not full and previous.get(key) == fingerprint
+                    and os.path.exists(self._partition_path(month, item_type))):
+                continue
+            written.append(key)
+        if written:
+            self._write_partitions(None if len(written) == len(current) else written)
+
+        # 数据库里已经没有的分区，同步删掉；除了上次的记录，也以磁盘上的目录为准，
+        # 这样 manifest 丢失时残留的分区同样会被清理
+        removed = []
+        for key in sorted((set(previous) | self._partitions_on_disk()) - set(current)):
+            month, item_type = key.split("/", 1)
+            self._remove_partition(month, item_type)
+            removed.append(key)
+
+        self._save_manifest(current)
+        return written, removed
+
+
+def load_snapshot(out_dir="data/snapshots", months=None, types=None, columns=None):
+    """读取快照为 DataFrame
+
+    以内存映射方式打开不压缩的 Arrow IPC 文件，列用 pd.ArrowDtype 保持 Arrow 存储，
+    数据缓冲区直接引用映射的文件内容，不会复制到进程内存。
+    """
+    import pandas as pd
+
+    dataset = ds.dataset(
+        out_dir,
+        format="ipc",
+        partitioning="hive",
+        filesystem=pafs.LocalFileSystem(use_mmap=True),
+    )
+    filter_expr = None
+    if months:
+        filter_expr = ds.field("month").isin(list(months))
+    if types:
+        type_expr = ds.field("type").isin(list(types))
+        filter_expr = type_expr if filter_expr is None else filter_expr & type_expr
+
+    table = dataset.to_table(columns=columns, filter=filter_expr)
+    return table.to_pandas(types_mapper=pd.ArrowDtype)
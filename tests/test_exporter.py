@@ -0,0 +1,157 @@
+import os
+
+import pytest
+
+from src.database import Database
+from src.exporter import SnapshotExporter, load_snapshot
+
+
+def make_item(item_id, item_type="papers", date="2025-12-04", tags=None):
+    return {
+        'id': item_id, 'type': item_type, 'source': "arxiv", 'title': f"title {item_id}",
+        'author': "someone", 'abstract': "abstract", 'url': f"https://example.com/{item_id}",
+        'date': date, 'tags': tags if tags is not None else ["manipulation"],
+    }
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = Database(str(tmp_path / "papers.db"))
+    db.upsert_item(make_item("a"))
+    db.upsert_item(make_item("b"))
+    db.upsert_item(make_item("c", item_type="projects", date="2025-11-20"))
+    yield db
+    db.close()
+
+
+@pytest.fixture
+def exporter(db, tmp_path):
+    return SnapshotExporter(db, out_dir=str(tmp_path / "snapshots"), batch_size=1)
+
+
+def test_first_export_writes_every_partition(exporter):
+    written, removed = exporter.export()
+    assert written == ["2025-11/projects", "2025-12/papers"]
+    assert removed == []
+
+
+def test_unchanged_partitions_are_skipped(exporter):
+    exporter.export()
+    assert exporter.export() == ([], [])
+
+
+def test_note_edit_of_same_length_is_exported(db, exporter):
+    db.update_user_interaction("a", notes="ab")
+    exporter.export()
+    db.update_user_interaction("a", notes="cd")
+    assert exporter.export() == (["2025-12/papers"], [])
+
+    df = load_snapshot(exporter.out_dir)
+    assert df.loc[df['id'] == "a", 'user_notes'].tolist() == ["cd"]
+
+
+def test_swapping_read_flag_between_items_is_exported(db, exporter):
+    db.update_user_interaction("a", is_read=1)
+    exporter.export()
+    db.update_user_interaction("a", is_read=0)
+    db.update_user_interaction("b", is_read=1)
+    assert exporter.export() == (["2025-12/papers"], [])
+
+    df = load_snapshot(exporter.out_dir).set_index('id')
+    assert df.loc["a", 'is_read'] == 0
+    assert df.loc["b", 'is_read'] == 1
+
+
+def test_removed_partition_is_deleted(db, exporter):
+    exporter.export()
+    db.conn.execute("DELETE FROM items WHERE id = 'c'")
+    db.conn.commit()
+    assert exporter.export() == ([], ["2025-11/projects"])
+    assert not os.path.exists(exporter._partition_dir("2025-11", "projects"))
+    assert sorted(load_snapshot(exporter.out_dir)['id'].tolist()) == ["a", "b"]
+
+
+def test_partition_missing_from_lost_manifest_is_deleted(db, exporter):
+    exporter.export()
+    os.remove(os.path.join(exporter.out_dir, "_manifest.json"))
+    db.conn.execute("DELETE FROM items WHERE id = 'c'")
+    db.conn.commit()
+    assert exporter.export(full=True) == (["2025-12/papers"], ["2025-11/projects"])
+    assert not os.path.exists(os.path.join(exporter.out_dir, "month=2025-11"))
+    assert sorted(load_snapshot(exporter.out_dir)['id'].tolist()) == ["a", "b"]
+
+
+def test_missing_partition_file_is_rewritten(exporter):
+    exporter.export()
+    os.remove(exporter._partition_path("2025-12", "papers"))
+    assert exporter.export() == (["2025-12/papers"], [])
+    assert os.path.exists(exporter._partition_path("2025-12", "papers"))
+
+
+def test_leftover_temp_file_is_ignored_by_loader(exporter):
+    exporter.export()
+    part_dir = exporter._partition_dir("2025-12", "papers")
+    with open(os.path.join(part_dir, "_part-0.arrow.tmp"), 'wb') as f:
+        f.write(b"half written")
+    assert len(load_snapshot(exporter.out_dir)) == 3
+
+
+def test_missing_month_and_type_go_to_unknown(db, exporter):
+    db.upsert_item(make_item("d", item_type="models", date=None))
+    db.upsert_item(make_item("e", item_type="models", date="None"))
+    db.upsert_item(make_item("f", item_type="", date=""))
+    written, _ = exporter.export()
+    assert "unknown/models" in written
+    assert "unknown/unknown" in written
+
+    df = load_snapshot(exporter.out_dir, months=["unknown"])
+    assert sorted(df['id'].tolist()) == ["d", "e", "f"]
+    assert sorted(set(df['type'].tolist())) == ["models", "unknown"]
+
+
+def test_tags_are_list_column(db, exporter):
+    db.upsert_item(make_item("g", tags=[]))
+    db.upsert_item(make_item("h", tags=["sim2real", "humanoid"]))
+    exporter.export()
+
+    df = load_snapshot(exporter.out_dir, types=["papers"]).set_index('id')
+    assert str(df['tags'].dtype).startswith("list<")
+    assert list(df.loc["h", 'tags']) == ["sim2real", "humanoid"]
+    assert list(df.loc["g", 'tags']) == []
+
+
+def test_non_list_tags_raise_with_item_id(db, exporter):
+    db.conn.execute("""UPDATE items SET tags = '"oops"' WHERE id = 'b'""")
+    db.conn.commit()
+    with pytest.raises(ValueError, match="id=b"):
+        exporter.export()
+
+
+def test_full_export_rewrites_everything(exporter):
+    exporter.export()
+    written, _ = exporter.export(full=True)
+    assert written == ["2025-11/projects", "2025-12/papers"]
+
+
+def test_export_reads_items_once_with_mixed_partition_batches(db, tmp_path):
+    exporter = SnapshotExporter(db, out_dir=str(tmp_path / "snapshots"), batch_size=1000)
+    statements = []
+    db.conn.set_trace_callback(statements.append)
+    exporter.export()
+    db.conn.set_trace_callback(None)
+
+    # 一次算指纹，一次读数据，与分区数量无关
+    assert len([sql for sql in statements if "FROM items" in sql]) == 2
+    df = load_snapshot(exporter.out_dir).set_index('id')
+    assert df.loc["c", 'type'] == "projects"
+    assert sorted(df.index.tolist()) == ["a", "b", "c"]
+
+
+def test_partial_export_only_rewrites_changed_partitions(db, exporter):
+    exporter.export()
+    db.update_user_interaction("c", is_star=1)
+    assert exporter.export() == (["2025-11/projects"], [])
+
+    df = load_snapshot(exporter.out_dir).set_index('id')
+    assert df.loc["c", 'is_star'] == 1
+    assert sorted(df.index.tolist()) == ["a", "b", "c"]